@@ -0,0 +1,35 @@
+import numpy as np
+from numba.pycc import CC
+
+# Ahead-of-time compiled kernels for the Rabi plan processor.
+#
+# Run `python rabi_kernels.py` once to build the `rabi_kernels_aot`
+# extension module next to this script; rabi_plan_processor imports it
+# when present so repeated runs skip JIT warmup entirely, and falls back
+# to JIT-compiling (or plain pandas) when it is not.
+
+cc = CC('rabi_kernels_aot')
+
+@cc.export('compute_progress', 'UniTuple(f8[:], 5)(f8[:], i8[:], i8[:])')
+def compute_progress(plots, total_days, days_elapsed):
+    """Compute the five derived progress columns in one compiled pass"""
+    n = plots.shape[0]
+    required_per_day = np.empty(n)
+    actual_per_day = np.empty(n)
+    required_percentage = np.empty(n)
+    actual_percentage = np.empty(n)
+    gap = np.empty(n)
+    total_plots_surveyed = 0.0  # You can update this with actual survey data
+    for i in range(n):
+        td = total_days[i]
+        el = days_elapsed[i]
+        p = plots[i]
+        required_per_day[i] = p / td if td > 0 else 0.0
+        actual_per_day[i] = total_plots_surveyed / el if el > 0 else 0.0
+        required_percentage[i] = el / td * 100.0 if td > 0 else 0.0
+        actual_percentage[i] = total_plots_surveyed / p * 100.0 if p > 0 else 0.0
+        gap[i] = actual_percentage[i] - required_percentage[i]
+    return required_per_day, actual_per_day, required_percentage, actual_percentage, gap
+
+if __name__ == '__main__':
+    cc.compile()
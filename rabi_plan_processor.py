@@ -1,21 +1,102 @@
 import pandas as pd
-import json
+import numpy as np
 import sys
 from pathlib import Path
 
+# Prefer the Rust-backed calamine engine for much faster xlsx parsing;
+# fall back to openpyxl when python-calamine is not installed
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Arrow-backed strings are several times smaller than object columns and
+# run .str operations in Arrow compute kernels
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+# Compiled kernel for the per-row progress arithmetic. Prefer the
+# ahead-of-time build (python rabi_kernels.py) which has no JIT warmup;
+# otherwise JIT the shared kernel, and if numba is not installed at all
+# the pandas expressions below remain the fallback.
+try:
+    from rabi_kernels_aot import compute_progress as _compute_progress
+except ImportError:
+    try:
+        from numba import njit
+        from rabi_kernels import compute_progress
+        _compute_progress = njit(cache=True, fastmath=True)(compute_progress)
+    except ImportError:
+        _compute_progress = None
+
+def _read_excel_cached(file_path, transform=None, **read_kwargs):
+    """Read an Excel sheet through a Parquet sidecar cache.
+
+    The sidecar is keyed on the source file's mtime and size, so repeat
+    runs over an unchanged workbook skip xlsx parsing entirely. An
+    optional transform is applied before caching so the sidecar stores
+    the normalized frame.
+    """
+    src = Path(file_path)
+    stat = src.stat()
+    cache = src.with_suffix(f'.{stat.st_mtime_ns}-{stat.st_size}.parquet')
+    if cache.exists():
+        return pd.read_parquet(cache)
+
+    df = pd.read_excel(file_path, **read_kwargs)
+    if transform is not None:
+        df = transform(df)
+
+    # Drop sidecars left behind by older versions of the source file
+    for stale in src.parent.glob(src.stem + '.*.parquet'):
+        if stale != cache:
+            stale.unlink()
+    try:
+        df.to_parquet(cache, compression='zstd')
+    except Exception as e:
+        print(f"Warning: could not write Parquet cache '{cache.name}': {e}")
+    return df
+
+def _normalize_sheet1(df):
+    """Promote the in-sheet header row and make the frame Parquet-friendly"""
+    # If columns are still unnamed, the actual headers are in the first row
+    if 'Unnamed' in str(df.columns[1]):
+        new_columns = df.iloc[0].tolist()
+        df.columns = new_columns
+        df = df.iloc[1:].reset_index(drop=True)
+
+    # Columns mixing numbers and stray text cannot round-trip through
+    # Parquet; store them uniformly as strings
+    object_cols = df.columns[df.dtypes == object]
+    df[object_cols] = df[object_cols].astype(STRING_DTYPE)
+    return df
+
+# Columns the Sheet2 pipeline actually consumes
+SHEET1_COLUMNS = [
+    'State',
+    'No. of Plots Targeted for Rabi DCS',
+    'Rabi DCS Activity Start Date',
+    'Rabi DCS Activity End Date',
+]
+
 def read_excel_sheet1(file_path):
     """Read Sheet1 from the Excel file"""
     try:
-        # Read with first row as header
-        df = pd.read_excel(file_path, sheet_name='Sheet 1', header=0)
-        
-        # If columns are still unnamed, try using the first row as column names
-        if 'Unnamed' in str(df.columns[1]):
-            # The actual headers are in the first row
-            new_columns = df.iloc[0].tolist()
-            df.columns = new_columns
-            df = df.iloc[1:].reset_index(drop=True)
-        
+        # The plan workbook keeps its real header in the second row, so read
+        # it directly with only the columns the processor uses
+        try:
+            df = _read_excel_cached(file_path, transform=_normalize_sheet1,
+                                    sheet_name='Sheet 1', header=1,
+                                    usecols=SHEET1_COLUMNS, engine=EXCEL_ENGINE)
+        except ValueError:
+            # Unexpected layout: fall back to autodetecting the header row
+            df = _read_excel_cached(file_path, transform=_normalize_sheet1,
+                                    sheet_name='Sheet 1', header=0,
+                                    engine=EXCEL_ENGINE)
         return df
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
@@ -26,125 +107,91 @@ def read_excel_sheet1(file_path):
 
 def generate_sheet2_data(sheet1_df):
     """Generate Sheet2 data based on Sheet1 data with calculated columns"""
-    
+
     if sheet1_df is None:
         return None
-    
-    sheet2_data = []
-    current_date = pd.Timestamp.now()
-    
-    for index, row in sheet1_df.iterrows():
-        # Skip if state is NaN or empty
-        if pd.isna(row['State']) or str(row['State']).strip() == '':
-            continue
-            
-        # Map columns from Sheet1 to Sheet2 structure
-        # a = State
-        # b = No. of Plots Targeted for Rabi DCS  
-        # c = Total Plots Surveyed (assume 0 for now, you can update this)
-        # d = Rabi DCS Activity Start Date
-        # e = Rabi DCS Activity End Date
-        
-        state = row['State']
-        plots_targeted = row['No. of Plots Targeted for Rabi DCS']
-        start_date = row['Rabi DCS Activity Start Date']
-        end_date = row['Rabi DCS Activity End Date']
-        
-        # Convert plots_targeted to numeric
-        try:
-            plots_targeted = pd.to_numeric(str(plots_targeted).replace(',', ''), errors='coerce')
-            if pd.isna(plots_targeted):
-                plots_targeted = 0
-        except:
-            plots_targeted = 0
-        
-        # Parse dates with proper format
-        try:
-            start_date_parsed = pd.to_datetime(start_date, dayfirst=True) if not pd.isna(start_date) else None
-            end_date_parsed = pd.to_datetime(end_date, dayfirst=True) if not pd.isna(end_date) else None
-        except:
-            start_date_parsed = None
-            end_date_parsed = None
-        
-        # Calculate derived fields
-        total_plots_surveyed = 0  # You can update this with actual survey data
-        
-        # Calculate days
-        if start_date_parsed and end_date_parsed:
-            total_days = (end_date_parsed - start_date_parsed).days
-            days_elapsed = (current_date - start_date_parsed).days
-            days_elapsed = max(0, min(days_elapsed, total_days))  # Clamp between 0 and total_days
-        else:
-            total_days = 0
-            days_elapsed = 0
-        
-        # Calculate required per day
-        required_per_day = plots_targeted / total_days if total_days > 0 else 0
-        
-        # Calculate actual per day
-        actual_per_day = total_plots_surveyed / days_elapsed if days_elapsed > 0 else 0
-        
-        # Calculate required percentage (time elapsed)
-        required_percentage = (days_elapsed / total_days * 100) if total_days > 0 else 0
-        
-        # Calculate actual percentage (survey done)
-        actual_percentage = (total_plots_surveyed / plots_targeted * 100) if plots_targeted > 0 else 0
-        
-        # Calculate gap
+
+    # One day-resolution scalar; subtracting it from the whole start-date
+    # array is a single vectorized int64 operation
+    now64 = np.datetime64(pd.Timestamp.now(), 'D')
+
+    # Column mapping from Sheet1 to Sheet2 structure
+    # a = State
+    # b = No. of Plots Targeted for Rabi DCS
+    # c = Total Plots Surveyed (assume 0 for now, you can update this)
+    # d = Rabi DCS Activity Start Date
+    # e = Rabi DCS Activity End Date
+
+    # Skip rows where state is NaN or empty
+    state = sheet1_df['State'].astype(STRING_DTYPE)
+    state_mask = state.notna() & (state.str.strip() != '').fillna(False)
+    df = sheet1_df[state_mask].reset_index(drop=True)
+
+    # Convert plots targeted to numeric (strip thousands separators)
+    plots_targeted = pd.to_numeric(
+        df['No. of Plots Targeted for Rabi DCS'].astype(STRING_DTYPE).str.replace(',', '', regex=False),
+        errors='coerce'
+    ).fillna(0).astype('int64')
+
+    # Parse both date columns in one pass; the plan sheet uses a fixed
+    # dd.mm.yyyy layout, so an explicit format skips the dateutil fallback
+    # and cache=True reuses parses of repeated date strings
+    start_date_parsed = pd.to_datetime(df['Rabi DCS Activity Start Date'],
+                                       format='%d.%m.%Y', errors='coerce', cache=True)
+    end_date_parsed = pd.to_datetime(df['Rabi DCS Activity End Date'],
+                                     format='%d.%m.%Y', errors='coerce', cache=True)
+
+    total_plots_surveyed = 0  # You can update this with actual survey data
+
+    # Calculate days; clamp elapsed between 0 and total_days
+    total_days = (end_date_parsed - start_date_parsed).dt.days.fillna(0).astype(int)
+    elapsed64 = now64 - start_date_parsed.to_numpy().astype('datetime64[D]')
+    days_elapsed = (
+        pd.Series(np.where(np.isnat(elapsed64), 0, elapsed64.astype('int64')), index=df.index)
+        .clip(lower=0)
+        .clip(upper=total_days.clip(lower=0))
+        .astype(int)
+    )
+
+    # Derived fields; zero denominators are masked out so the result stays 0
+    if _compute_progress is not None:
+        required_per_day, actual_per_day, required_percentage, actual_percentage, gap = (
+            pd.Series(values, index=df.index)
+            for values in _compute_progress(
+                plots_targeted.to_numpy(np.float64),
+                total_days.to_numpy(np.int64),
+                days_elapsed.to_numpy(np.int64),
+            )
+        )
+        gap = gap + 0.0  # normalize the -0.0 the fastmath kernel produces for zero gaps
+    else:
+        required_per_day = (plots_targeted / total_days.where(total_days > 0)).fillna(0)
+        actual_per_day = (total_plots_surveyed / days_elapsed.where(days_elapsed > 0)).fillna(0)
+        required_percentage = (days_elapsed / total_days.where(total_days > 0) * 100).fillna(0)
+        actual_percentage = (total_plots_surveyed / plots_targeted.where(plots_targeted > 0) * 100).fillna(0)
         gap = actual_percentage - required_percentage
-        
-        # Format gap with emoji
-        if gap >= 0:
-            gap_formatted = f"✅ +{gap:.1f}%"
-        else:
-            gap_formatted = f"🔻{gap:.1f}%"
-        
-        # Create Sheet2 row
-        sheet2_row = {
-            'a': state,  # State
-            'b': plots_targeted,  # No. of Plots Targeted for Rabi DCS
-            'c': total_plots_surveyed,  # Total Plots Surveyed
-            'd': start_date,  # Rabi DCS Activity Start Date
-            'e': end_date,  # Rabi DCS Activity End Date
-            'days': days_elapsed,
-            'Total Days': total_days,
-            'Days Elapsed': days_elapsed,
-            'Required /day': round(required_per_day, 1),
-            'Actual /day': round(actual_per_day, 1),
-            'Required % (Time elapsed)': round(required_percentage, 1),
-            'Actual % (Survey done)': round(actual_percentage, 1),
-            'Gap': gap_formatted
-        }
-        
-        sheet2_data.append(sheet2_row)
-    
-    return sheet2_data
 
-def convert_to_json(data):
-    """Convert data to JSON format with proper handling of pandas/numpy types"""
-    if data is None:
-        return None
-    
-    # Convert pandas/numpy types to Python native types for JSON serialization
-    def convert_types(obj):
-        if pd.isna(obj):
-            return None
-        elif isinstance(obj, pd.Timestamp):
-            return obj.strftime('%Y-%m-%d %H:%M:%S')
-        elif isinstance(obj, (pd.Int64Dtype, int)):
-            return int(obj) if not pd.isna(obj) else None
-        elif isinstance(obj, float):
-            return float(obj) if not pd.isna(obj) else None
-        else:
-            return str(obj)
-    
-    # Apply conversion to all data
-    converted_data = []
-    for row in data:
-        converted_row = {k: convert_types(v) for k, v in row.items()}
-        converted_data.append(converted_row)
-    
-    return json.dumps(converted_data, indent=2, ensure_ascii=False)
+    # Format gap with emoji in one vectorized pass
+    gap_rounded = gap.round(1).astype(str) + '%'
+    gap_formatted = np.where(gap.to_numpy() >= 0, '✅ +' + gap_rounded, '🔻' + gap_rounded)
+
+    sheet2_df = pd.DataFrame({
+        'a': df['State'],
+        'b': plots_targeted,
+        'c': total_plots_surveyed,
+        'd': df['Rabi DCS Activity Start Date'],
+        'e': df['Rabi DCS Activity End Date'],
+        'days': days_elapsed,
+        'Total Days': total_days,
+        'Days Elapsed': days_elapsed,
+        'Required /day': required_per_day.round(1),
+        'Actual /day': actual_per_day.round(1),
+        'Required % (Time elapsed)': required_percentage.round(1),
+        'Actual % (Survey done)': actual_percentage.round(1),
+        'Gap': gap_formatted
+    })
+
+    return sheet2_df
 
 def main():
     # File path for the Excel file
@@ -168,27 +215,20 @@ def main():
     
     # Generate Sheet2 data with calculations
     print("Generating Sheet2 data with calculations...")
-    sheet2_data = generate_sheet2_data(sheet1_df)
-    
-    if sheet2_data is None:
+    sheet2_df = generate_sheet2_data(sheet1_df)
+
+    if sheet2_df is None:
         print("Failed to generate Sheet2 data.")
         return
-    
-    print(f"Generated {len(sheet2_data)} rows for Sheet2.")
-    
-    # Convert to JSON
+
+    print(f"Generated {len(sheet2_df)} rows for Sheet2.")
+
+    # Save JSON to file with pandas' C JSON writer
     print("Converting to JSON format...")
-    json_output = convert_to_json(sheet2_data)
-    
-    if json_output is None:
-        print("Failed to convert to JSON.")
-        return
-    
-    # Save JSON to file
     output_file = "sheet2_data.json"
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(json_output)
+        sheet2_df.to_json(output_file, orient='records', date_format='iso',
+                          force_ascii=False, indent=2)
         print(f"Sheet2 data saved to {output_file}")
     except Exception as e:
         print(f"Error saving JSON file: {e}")
@@ -204,9 +244,8 @@ def main():
     # Also print to console (first few records)
     print(f"\nFirst 3 records of Sheet2 data in JSON format:")
     try:
-        data_list = json.loads(json_output)
-        preview = data_list[:3] if len(data_list) > 3 else data_list
-        print(json.dumps(preview, indent=2, ensure_ascii=False))
+        print(sheet2_df.head(3).to_json(orient='records', date_format='iso',
+                                        force_ascii=False, indent=2))
     except Exception as e:
         print(f"Error displaying preview: {e}")
 
@@ -1,5 +1,149 @@
+import csv
+import shutil
+import subprocess
 import pandas as pd
 import numpy as np
+from pathlib import Path
+
+# Prefer the Rust-backed calamine engine for much faster xlsx parsing;
+# fall back to openpyxl when python-calamine is not installed
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Optional Polars fast path: computes all aggregates in one pass over
+# Arrow columns instead of separate pandas scans
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Optional Numba reduction for the pandas path: one streaming pass over
+# the counts and district-code arrays instead of four separate scans
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _reduce_survey(counts, codes, n_districts):
+        total = 0
+        villages = 0
+        seen_all = np.zeros(n_districts, np.uint8)
+        seen_pos = np.zeros(n_districts, np.uint8)
+        for i in range(counts.size):
+            c = counts[i]
+            k = codes[i]
+            total += c
+            if c > 0:
+                villages += 1
+            if k >= 0:
+                seen_all[k] = 1
+                if c > 0:
+                    seen_pos[k] = 1
+        return total, villages, int(seen_pos.sum()), int(seen_all.sum())
+else:
+    _reduce_survey = None
+
+def _read_excel_cached(file_path, transform=None, **read_kwargs):
+    """Read an Excel sheet through a Parquet sidecar cache.
+
+    The sidecar is keyed on the source file's mtime and size, so repeat
+    runs over an unchanged workbook skip xlsx parsing entirely. An
+    optional transform is applied before caching so the sidecar stores
+    the normalized frame.
+    """
+    cache = _sidecar_path(file_path, 'parquet')
+    if cache.exists():
+        return pd.read_parquet(cache)
+
+    df = pd.read_excel(file_path, **read_kwargs)
+    if transform is not None:
+        df = transform(df)
+
+    _drop_stale_sidecars(file_path, cache)
+    try:
+        df.to_parquet(cache, compression='zstd')
+    except Exception as e:
+        print(f"Warning: could not write Parquet cache '{cache.name}': {e}")
+    return df
+
+def _sidecar_path(file_path, ext):
+    """Cache path next to the workbook, keyed on its mtime and size"""
+    src = Path(file_path)
+    stat = src.stat()
+    return src.with_suffix(f'.{stat.st_mtime_ns}-{stat.st_size}.{ext}')
+
+def _drop_stale_sidecars(file_path, keep):
+    """Remove sidecars left behind by older versions of the source file"""
+    src = Path(file_path)
+    for stale in src.parent.glob(src.stem + f'.*{keep.suffix}'):
+        if stale != keep:
+            stale.unlink()
+
+def _read_survey_csv_cached(excel_file_path, sheet_name, usecols, dtype):
+    """First-run fast path: pre-export the sheet to CSV with xlsx2csv.
+
+    The CSV sidecar is keyed on the workbook's mtime and size like the
+    Parquet cache, and is read back through pandas' pyarrow CSV reader.
+    Returns None when xlsx2csv is unavailable or the export cannot be
+    parsed, in which case the caller reads the xlsx directly.
+    """
+    if shutil.which('xlsx2csv') is None:
+        return None
+    cache = _sidecar_path(excel_file_path, 'csv')
+    try:
+        if not cache.exists():
+            subprocess.run(['xlsx2csv', '-n', sheet_name, str(excel_file_path), str(cache)],
+                           check=True)
+            _drop_stale_sidecars(excel_file_path, cache)
+
+        # xlsx2csv pads data rows of this report with trailing empty
+        # fields the header line does not have; name them explicitly so
+        # the strict pyarrow reader accepts the file
+        with open(cache, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            first_row = next(reader, header)
+        extra = [f'_trailing_{i}' for i in range(len(first_row) - len(header))]
+        if extra:
+            # the pyarrow engine mishandles explicit names with usecols,
+            # so ragged exports go through the C engine
+            return pd.read_csv(cache, skiprows=1, names=header + extra,
+                               usecols=usecols, dtype=dtype)
+        return pd.read_csv(cache, usecols=usecols, dtype=dtype, engine='pyarrow')
+    except Exception as e:
+        print(f"CSV fast path unavailable ({e}), reading xlsx directly")
+        return None
+
+def _analyze_survey_polars(excel_file_path, survey_count_col, district_col):
+    """Single-pass Polars aggregation over the survey sheet (fast path)"""
+    try:
+        # Go through the Parquet sidecar so repeat runs skip xlsx parsing
+        # on this path too
+        cache = _sidecar_path(excel_file_path, 'parquet')
+        if cache.exists():
+            lf = pl.scan_parquet(cache)
+        else:
+            frame = pl.read_excel(excel_file_path, sheet_name='Daily_Survey Summary Report')
+            _drop_stale_sidecars(excel_file_path, cache)
+            frame.write_parquet(cache)
+            lf = frame.lazy()
+        has_surveys = pl.col(survey_count_col) > 0
+        out = lf.select([
+            pl.col(survey_count_col).sum().alias('total_surveys_today'),
+            has_surveys.sum().alias('villages_with_surveys'),
+            pl.len().alias('total_villages'),
+            pl.col(district_col).filter(has_surveys).n_unique().alias('districts_with_surveys'),
+            pl.col(district_col).n_unique().alias('total_districts'),
+        ]).collect()
+        return out.to_dicts()[0]
+    except Exception as e:
+        print(f"Polars fast path unavailable ({e}), falling back to pandas")
+        return None
 
 def analyze_survey_data(excel_file_path):
     """
@@ -12,10 +156,34 @@ def analyze_survey_data(excel_file_path):
         dict: Analysis results containing total surveys and district/village counts
     """
     
+    survey_count_col = 'Total Survey Completed By Surveyor'
+    district_col = 'District Name'
+    village_col = 'Village Name'
+
+    if pl is not None:
+        results = _analyze_survey_polars(excel_file_path, survey_count_col, district_col)
+        if results is not None:
+            return results
+
     try:
-        
-        df = pd.read_excel(excel_file_path, sheet_name='Daily_Survey Summary Report')
-        
+
+        # Read only the three columns the analysis uses, with their final
+        # dtypes, so no other column is parsed or inferred
+        df = _read_survey_csv_cached(
+            excel_file_path,
+            sheet_name='Daily_Survey Summary Report',
+            usecols=[survey_count_col, district_col, village_col],
+            dtype={district_col: 'category', village_col: 'category'},
+        )
+        if df is None:
+            df = _read_excel_cached(
+                excel_file_path,
+                sheet_name='Daily_Survey Summary Report',
+                usecols=[survey_count_col, district_col, village_col],
+                dtype={district_col: 'category', village_col: 'category'},
+                engine=EXCEL_ENGINE,
+            )
+
         print("Excel file loaded successfully!")
         print(f"Shape of data: {df.shape}")
         print(f"Columns in the sheet: {list(df.columns)}")
@@ -23,13 +191,8 @@ def analyze_survey_data(excel_file_path):
         print(df.head())
         
         results = {}
-        
-        
-        survey_count_col = 'Total Survey Completed By Surveyor'
-        district_col = 'District Name'
-        village_col = 'Village Name'
-        
-        
+
+
         missing_cols = []
         if survey_count_col not in df.columns:
             missing_cols.append(survey_count_col)
@@ -48,23 +211,32 @@ def analyze_survey_data(excel_file_path):
         print(f"  Survey count: '{survey_count_col}'")
         print(f"  District: '{district_col}'")
         print(f"  Village: '{village_col}'")
-        
-        
-        total_surveys = df[survey_count_col].sum()
-        results['total_surveys_today'] = total_surveys
-        
-        
-        villages_with_surveys = len(df[df[survey_count_col] > 0])
-        results['villages_with_surveys'] = villages_with_surveys
-        total_villages = len(df)
-        results['total_villages'] = total_villages
-        
-        
-        districts_with_surveys_df = df[df[survey_count_col] > 0]
-        districts_with_surveys = districts_with_surveys_df[district_col].nunique()
-        results['districts_with_surveys'] = districts_with_surveys
-        total_districts = df[district_col].nunique()
-        results['total_districts'] = total_districts
+
+        counts = df[survey_count_col].to_numpy()
+        districts = df[district_col]
+        if districts.dtype != 'category':
+            districts = districts.astype('category')
+
+        if _reduce_survey is not None and np.issubdtype(counts.dtype, np.integer):
+            # Single streaming pass over the counts and district codes
+            total, villages, d_pos, d_all = _reduce_survey(
+                counts, districts.cat.codes.to_numpy(np.int64),
+                len(districts.cat.categories))
+            results['total_surveys_today'] = total
+            results['villages_with_surveys'] = villages
+            results['total_villages'] = len(df)
+            results['districts_with_surveys'] = d_pos
+            results['total_districts'] = d_all
+        else:
+            results['total_surveys_today'] = counts.sum()
+
+            # Compute the >0 mask once and slice only the district column
+            # with it, instead of materialising full masked copies of the frame
+            mask = counts > 0
+            results['villages_with_surveys'] = int(mask.sum())
+            results['total_villages'] = len(df)
+            results['districts_with_surveys'] = districts[mask].nunique()
+            results['total_districts'] = districts.nunique()
         
         return results
         